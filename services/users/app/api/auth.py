@@ -3,12 +3,18 @@ Authentication API routes - migrated from monolith auth/routes.py
 """
 
 import structlog
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.database import get_db
+from ..core.idempotency import IdempotencyKeyMismatch, IdempotencyRequestInProgress, idempotency
 from ..core.security import create_access_token
 from ..schemas.user import UserCreate, UserLogin, Token, UserResponse
+from ..services.login_activity import login_activity
 from ..services.user_service import UserService
 
 logger = structlog.get_logger()
@@ -16,16 +22,67 @@ logger = structlog.get_logger()
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
+# Upper bound on client-supplied Idempotency-Key length
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def signup(
     user_data: UserCreate,
+    idempotency_key: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """
     User registration - migrated from monolith signup route
     
-    Creates a new user account and returns JWT token for immediate login
+    Creates a new user account and returns JWT token for immediate login.
+    Retries sending the same Idempotency-Key get the original 201 replayed
+    without re-hashing the password or touching the database.
     """
+    if not idempotency_key:
+        return await register_user(user_data, db)
+    
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key is too long"
+        )
+    
+    fingerprint = idempotency.fingerprint(user_data.name, user_data.email.lower(), user_data.password)
+    
+    try:
+        stored = await idempotency.acquire(idempotency_key, fingerprint)
+    except IdempotencyKeyMismatch:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    except IdempotencyRequestInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+    
+    if stored is not None:
+        logger.info("Replaying signup response", idempotency_key=idempotency_key)
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=stored.body,
+            headers={"Idempotent-Replayed": "true"}
+        )
+    
+    try:
+        token = await register_user(user_data, db)
+        await idempotency.complete(
+            idempotency_key, fingerprint, status.HTTP_201_CREATED, jsonable_encoder(token)
+        )
+        return token
+    finally:
+        idempotency.release(idempotency_key)
+
+
+async def register_user(user_data: UserCreate, db: AsyncSession) -> Token:
+    """Validate, create and log in a new user"""
     try:
         # Validate password length (same as monolith)
         if len(user_data.password) < 6:
@@ -58,6 +115,12 @@ async def signup(
         
     except HTTPException:
         raise
+    except IntegrityError:
+        # Registered concurrently, or by another worker since our email filter was rebuilt
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     except Exception as e:
         logger.error("Error during signup", error=str(e), email=user_data.email)
         raise HTTPException(
@@ -81,12 +144,15 @@ async def login(
         user = await UserService.get_user_by_email(db, login_data.email)
         
         # Verify user exists and password is correct (same logic as monolith)
-        if not user or not UserService.verify_password(user, login_data.password):
+        if not user or not await UserService.verify_password(user, login_data.password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
             )
         
+        # Buffered and written in batches - no write on the login path
+        login_activity.record(user.id)
+        
         # Create JWT token (replaces session management from monolith)
         access_token = create_access_token(
             data={"sub": str(user.id), "email": user.email, "is_admin": user.is_admin}
@@ -0,0 +1,56 @@
+"""
+Debug endpoints - on-demand profiling of a running worker
+"""
+
+import asyncio
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from ..core.config import settings
+from ..core.profiler import ProfilerBusyError, profiler
+from ..schemas.user import UserResponse
+from .users import get_current_user
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: int = Query(30, ge=1, le=settings.profiler_max_seconds),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Profile this worker for the given number of seconds (admin only)
+
+    Returns collapsed-stack output, e.g. `flamegraph.pl profile.txt > cpu.svg`
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    if profiler.running:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running"
+        )
+
+    logger.info("Profiling started", seconds=seconds, user_id=current_user.id)
+
+    try:
+        # Sample from a worker thread so the event loop keeps serving traffic
+        collapsed = await asyncio.to_thread(profiler.profile, seconds)
+    except ProfilerBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running"
+        )
+
+    logger.info("Profiling completed", seconds=seconds, user_id=current_user.id)
+
+    return collapsed
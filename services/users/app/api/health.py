@@ -8,7 +8,7 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
-from ..core.database import get_db
+from ..core.database import get_db, shard_router
 
 logger = structlog.get_logger()
 
@@ -22,8 +22,9 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     Similar pattern to Go catalog service
     """
     try:
-        # Test database connection
-        await db.execute(text("SELECT 1"))
+        # Test database connection (every shard when sharded)
+        for shard_id in shard_router.shard_ids:
+            await db.execute(text("SELECT 1"), bind_arguments=shard_router.bind_for_shard(shard_id))
         
         return {
             "data": {
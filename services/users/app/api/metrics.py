@@ -4,7 +4,7 @@ Basic metrics endpoint for Prometheus
 
 from fastapi import APIRouter
 from fastapi.responses import PlainTextResponse
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
 
 # Basic metrics similar to Go catalog service
 request_count = Counter(
@@ -19,6 +19,105 @@ request_duration = Histogram(
     ["method", "endpoint"]
 )
 
+# Database query metrics, labelled by normalized statement fingerprint
+db_query_duration = Histogram(
+    "users_db_query_duration_seconds",
+    "Database query duration in seconds",
+    ["fingerprint"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+db_query_count = Counter(
+    "users_db_queries_total",
+    "Total database queries executed",
+    ["fingerprint"]
+)
+
+db_query_rows = Counter(
+    "users_db_query_rows_total",
+    "Total rows returned or affected by database queries (excludes streamed/server-side results)",
+    ["fingerprint"]
+)
+
+db_slow_query_count = Counter(
+    "users_db_slow_queries_total",
+    "Database queries slower than the slow query threshold",
+    ["fingerprint"]
+)
+
+# Admission control metrics, per route class
+admission_in_flight = Gauge(
+    "users_admission_in_flight",
+    "Requests currently admitted and being processed",
+    ["route_class"]
+)
+
+admission_queued = Gauge(
+    "users_admission_queued",
+    "Requests waiting for admission",
+    ["route_class"]
+)
+
+admission_limit = Gauge(
+    "users_admission_concurrency_limit",
+    "Current adaptive concurrency limit",
+    ["route_class"]
+)
+
+admission_shed = Counter(
+    "users_admission_shed_total",
+    "Requests rejected with 503 by admission control",
+    ["route_class", "reason"]
+)
+
+# Email-availability Bloom filter metrics
+email_filter_checks = Counter(
+    "users_email_filter_checks_total",
+    "email_exists checks by outcome (filter_negative skips the database)",
+    ["result"]
+)
+
+email_filter_items = Gauge(
+    "users_email_filter_items",
+    "Emails added to the Bloom filter"
+)
+
+email_filter_size_bytes = Gauge(
+    "users_email_filter_size_bytes",
+    "Bloom filter bit array size in bytes"
+)
+
+email_filter_false_positive_rate = Gauge(
+    "users_email_filter_false_positive_rate",
+    "Estimated Bloom filter false positive rate"
+)
+
+email_filter_rebuild_duration = Histogram(
+    "users_email_filter_rebuild_duration_seconds",
+    "Time taken to rebuild the Bloom filter from the database"
+)
+
+# Write-behind login activity metrics
+login_activity_buffer_depth = Gauge(
+    "users_login_activity_buffer_depth",
+    "Users with login activity waiting to be flushed"
+)
+
+login_activity_flush_duration = Histogram(
+    "users_login_activity_flush_duration_seconds",
+    "Time taken to write one batch of login activity"
+)
+
+login_activity_flushed_users = Counter(
+    "users_login_activity_flushed_users_total",
+    "User rows updated by login activity flushes"
+)
+
+login_activity_flush_failures = Counter(
+    "users_login_activity_flush_failures_total",
+    "Login activity batches that failed and were requeued"
+)
+
 router = APIRouter(tags=["metrics"])
 
 
@@ -2,26 +2,65 @@
 User management API routes
 """
 
+import hashlib
 import structlog
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import settings
 from ..core.database import get_db
 from ..core.security import verify_token
-from ..schemas.user import UserResponse, UserUpdate
+from ..schemas.user import UserChangeFeed, UserChangeResponse, UserResponse, UserUpdate
+from ..services.change_feed import ChangeFeedCursorExpired, change_feed
 from ..services.user_service import UserService
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Profiles are per-user and must be revalidated, but revalidation is cheap (304)
+USER_CACHE_CONTROL = "private, no-cache"
 
-async def get_current_user(
-    authorization: Optional[str] = Header(None),
-    db: AsyncSession = Depends(get_db)
-) -> UserResponse:
-    """Get current authenticated user from JWT token"""
+# Bump when UserResponse changes shape so clients don't keep stale representations
+USER_ETAG_VERSION = "1"
+
+
+def user_etag(user_id: int, updated_at: Optional[datetime]) -> str:
+    """Strong ETag for a user representation, derived from id + updated_at"""
+    version = updated_at.isoformat() if updated_at else ""
+    digest = hashlib.sha1(f"{USER_ETAG_VERSION}:{user_id}:{version}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = USER_CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
+
+
+async def get_current_user_id(
+    authorization: Optional[str] = Header(None)
+) -> int:
+    """Get current authenticated user's ID from JWT token, without a database lookup"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,7 +76,14 @@ async def get_current_user(
             detail="Invalid or expired token"
         )
     
-    user_id = int(payload.get("sub"))
+    return int(payload.get("sub"))
+
+
+async def get_current_user(
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+) -> UserResponse:
+    """Get current authenticated user from JWT token"""
     user = await UserService.get_user_by_id(db, user_id)
     
     if not user:
@@ -49,17 +95,52 @@ async def get_current_user(
     return UserResponse.from_orm(user)
 
 
+async def get_user_conditional(
+    db: AsyncSession,
+    user_id: int,
+    if_none_match: Optional[str],
+    response: Response
+):
+    """
+    Load a user for a conditional GET
+
+    With If-None-Match, validates it against an updated_at-only query and returns
+    a bare 304 on a match, so the full row is only loaded and serialized when it
+    changed. Plain GETs skip that probe and load the row in one query.
+    """
+    if if_none_match is not None:
+        updated_at = await UserService.get_user_updated_at(db, user_id)
+        etag = user_etag(user_id, updated_at)
+        if updated_at is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    user = await UserService.get_user_by_id(db, user_id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    set_cache_headers(response, user_etag(user.id, user.updated_at))
+    return UserResponse.from_orm(user)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
-    current_user: UserResponse = Depends(get_current_user)
+    response: Response,
+    current_user_id: int = Depends(get_current_user_id),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get current user's profile"""
-    return current_user
+    """Get current user's profile (supports If-None-Match)"""
+    return await get_user_conditional(db, current_user_id, if_none_match, response)
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_current_user_profile(
     user_data: UserUpdate,
+    response: Response,
     current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -83,10 +164,17 @@ async def update_current_user_profile(
         
         logger.info("User profile updated", user_id=current_user.id, email=current_user.email)
         
+        set_cache_headers(response, user_etag(updated_user.id, updated_user.updated_at))
         return UserResponse.from_orm(updated_user)
         
     except HTTPException:
         raise
+    except IntegrityError:
+        # Taken concurrently, or by another worker since our email filter was rebuilt
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     except Exception as e:
         logger.error("Error updating user profile", error=str(e), user_id=current_user.id)
         raise HTTPException(
@@ -95,26 +183,67 @@ async def update_current_user_profile(
         )
 
 
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user_by_id(
-    user_id: int,
+@router.get("/changes", response_model=UserChangeFeed)
+async def get_user_changes(
+    since: str = Query("0"),
+    limit: int = Query(100, ge=1, le=settings.change_feed_max_batch_size),
+    wait: int = Query(0, ge=0, le=settings.change_feed_max_wait_seconds),
     current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get user by ID (admin only or own profile)"""
-    # Allow users to view their own profile, admins can view any profile
-    if user_id != current_user.id and not current_user.is_admin:
+    """
+    Incremental feed of user creates/updates (admin only)
+
+    Returns up to `limit` changes after the opaque `since` cursor. With `wait` > 0 the
+    request long-polls for up to that many seconds when nothing is new yet.
+    """
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
-    user = await UserService.get_user_by_id(db, user_id)
+    try:
+        positions = change_feed.parse_cursor(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
     
-    if not user:
+    # Release the pooled connection held since the auth lookup before long-polling
+    await db.rollback()
+    
+    try:
+        changes, positions = await change_feed.wait_for_changes(positions, limit, timeout=wait)
+    except ChangeFeedCursorExpired:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
+            status_code=status.HTTP_410_GONE,
+            detail="Cursor expired - changes were pruned. Re-sync and restart from since=0"
         )
     
-    return UserResponse.from_orm(user)
\ No newline at end of file
+    return UserChangeFeed(
+        changes=[UserChangeResponse.from_orm(change) for change in changes],
+        cursor=change_feed.format_cursor(positions)
+    )
+
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user_by_id(
+    user_id: int,
+    response: Response,
+    current_user_id: int = Depends(get_current_user_id),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get user by ID (admin only or own profile, supports If-None-Match)"""
+    # Allow users to view their own profile, admins can view any profile
+    if user_id != current_user_id:
+        current_user = await get_current_user(current_user_id, db)
+        if not current_user.is_admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+    
+    return await get_user_conditional(db, user_id, if_none_match, response)
@@ -0,0 +1,165 @@
+"""
+Adaptive admission control - per route class concurrency limits with load shedding
+
+Each route class gets its own AIMD (additive increase, multiplicative decrease)
+concurrency limit: the limit creeps up while requests finish under the target
+latency and is cut back when they don't. Requests over the limit wait in a
+bounded queue; when the queue is full or the wait times out the request is shed
+with 503 + Retry-After before it touches the database or the password hasher.
+"""
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+
+from ..api.metrics import admission_in_flight, admission_limit, admission_queued, admission_shed
+from .config import settings
+
+
+@dataclass
+class RouteClassConfig:
+    """Tuning for one route class"""
+    initial_limit: int
+    min_limit: int
+    max_limit: int
+    max_queue: int
+    target_latency: float
+    backoff_ratio: float = 0.9
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, route_class: str, reason: str):
+        super().__init__(f"{route_class}: {reason}")
+        self.route_class = route_class
+        self.reason = reason
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with a bounded FIFO wait queue"""
+
+    def __init__(self, name: str, config: RouteClassConfig, queue_timeout: float):
+        self.name = name
+        self.config = config
+        self.queue_timeout = queue_timeout
+        self.limit = float(config.initial_limit)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        admission_limit.labels(route_class=name).set(self.limit)
+
+    async def acquire(self) -> None:
+        """Admit the request, waiting in the queue if needed, or raise AdmissionRejected"""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._admit()
+            return
+
+        if len(self._waiters) >= self.config.max_queue:
+            self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        admission_queued.labels(route_class=self.name).set(len(self._waiters))
+
+        try:
+            # asyncio.wait, unlike wait_for, never swallows a cancellation that
+            # races with the slot being granted
+            await asyncio.wait((waiter,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us but the client went away
+                self.release(latency=None)
+            waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            admission_queued.labels(route_class=self.name).set(len(self._waiters))
+
+        # A waiter granted right as the timeout fired keeps its slot
+        if not waiter.done():
+            waiter.cancel()
+            self._shed("queue_timeout")
+
+    def release(self, latency: Optional[float], overloaded: bool = False) -> None:
+        """Return a slot and adapt the limit from the observed latency"""
+        self.in_flight -= 1
+
+        if latency is not None:
+            if overloaded or latency > self.config.target_latency:
+                self.limit = max(self.config.min_limit, self.limit * self.config.backoff_ratio)
+            else:
+                # +1 per full window of successful requests
+                self.limit = min(self.config.max_limit, self.limit + 1 / self.limit)
+            admission_limit.labels(route_class=self.name).set(self.limit)
+
+        admission_in_flight.labels(route_class=self.name).set(self.in_flight)
+        self._wake_waiters()
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        admission_in_flight.labels(route_class=self.name).set(self.in_flight)
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._admit()
+            waiter.set_result(None)
+
+    def _shed(self, reason: str) -> None:
+        admission_shed.labels(route_class=self.name, reason=reason).inc()
+        raise AdmissionRejected(self.name, reason)
+
+
+class AdmissionController:
+    """Maps request paths to route classes and holds one limiter per class"""
+
+    # Paths doing bcrypt work get their own, much smaller budget
+    EXPENSIVE_PATHS = {"/api/v1/auth/login", "/api/v1/auth/signup"}
+    # Operational endpoints must stay reachable while the service is overloaded.
+    # The change feed long-polls for up to 30s: it would pin slots for the whole
+    # wait and its latency would drive the AIMD limit down for every other route.
+    EXEMPT_PREFIXES = ("/metrics", "/debug/", "/api/v1/users/changes")
+
+    def __init__(self, classes: Dict[str, RouteClassConfig], queue_timeout: float):
+        self.limiters = {
+            name: AdaptiveLimiter(name, config, queue_timeout)
+            for name, config in classes.items()
+        }
+
+    def classify(self, path: str) -> Optional[str]:
+        """Return the route class for a path, or None if it bypasses admission control"""
+        if path.startswith(self.EXEMPT_PREFIXES):
+            return None
+        if path in self.EXPENSIVE_PATHS:
+            return "auth"
+        return "default"
+
+    def limiter_for(self, path: str) -> Optional[AdaptiveLimiter]:
+        route_class = self.classify(path)
+        return self.limiters[route_class] if route_class else None
+
+
+admission_controller = AdmissionController(
+    classes={
+        "auth": RouteClassConfig(
+            initial_limit=settings.admission_auth_initial_limit,
+            min_limit=1,
+            max_limit=settings.admission_auth_max_limit,
+            max_queue=settings.admission_auth_max_queue,
+            target_latency=settings.admission_auth_target_latency_ms / 1000,
+        ),
+        "default": RouteClassConfig(
+            initial_limit=settings.admission_default_initial_limit,
+            min_limit=1,
+            max_limit=settings.admission_default_max_limit,
+            max_queue=settings.admission_default_max_queue,
+            target_latency=settings.admission_default_target_latency_ms / 1000,
+        ),
+    },
+    queue_timeout=settings.admission_queue_timeout_ms / 1000,
+)
+
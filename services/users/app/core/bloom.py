@@ -0,0 +1,50 @@
+"""
+Minimal Bloom filter for fast negative membership checks
+"""
+
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter using double hashing over a single blake2b digest
+
+    Never returns a false negative; false positives occur at roughly
+    `estimated_false_positive_rate` once populated.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.bits_set = 0
+        self.items = 0
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for index in self._indexes(key):
+            byte, mask = index >> 3, 1 << (index & 7)
+            if not self.bits[byte] & mask:
+                self.bits[byte] |= mask
+                self.bits_set += 1
+        self.items += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(key))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.bits)
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """Current false positive probability, estimated from the fraction of bits set"""
+        return (self.bits_set / self.num_bits) ** self.num_hashes
@@ -3,6 +3,7 @@ Configuration for Users Service
 """
 
 import os
+from typing import List
 from pydantic_settings import BaseSettings
 
 
@@ -19,6 +20,15 @@ class Settings(BaseSettings):
     db_password: str = "users_password"
     db_name: str = "localmart_users"
     
+    # Sharding - leave both unset for a single database.
+    # shard_dsns is a JSON list, e.g. USERS_SHARD_DSNS='["postgresql+asyncpg://...", ...]'
+    shard_dsns: List[str] = []
+    # Test mode: run N shards as local databases <db_name>_shard<i> on db_host
+    local_shard_count: int = 0
+    # Commit multi-shard transactions (e.g. an email change) with two-phase
+    # commit. Requires max_prepared_transactions > 0 on every shard.
+    shard_two_phase_commit: bool = False
+    
     # JWT config
     jwt_secret_key: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
@@ -26,11 +36,72 @@ class Settings(BaseSettings):
     
     # Logging
     log_level: str = "INFO"
+    slow_query_threshold_ms: int = 100
+    
+    # Admission control / load shedding, per route class
+    admission_enabled: bool = True
+    admission_queue_timeout_ms: int = 1000
+    admission_retry_after_seconds: int = 1
+    admission_auth_initial_limit: int = 4
+    admission_auth_max_limit: int = 16
+    admission_auth_max_queue: int = 32
+    admission_auth_target_latency_ms: int = 500
+    admission_default_initial_limit: int = 20
+    admission_default_max_limit: int = 100
+    admission_default_max_queue: int = 100
+    admission_default_target_latency_ms: int = 100
+    
+    # Email-availability Bloom filter
+    email_filter_enabled: bool = True
+    email_filter_false_positive_rate: float = 0.01
+    email_filter_min_capacity: int = 100000
+    email_filter_rebuild_interval_seconds: int = 300
+    email_filter_scan_batch_size: int = 1000
+    
+    # Write-behind login activity
+    login_activity_flush_interval_seconds: int = 5
+    login_activity_flush_threshold: int = 1000
+    login_activity_batch_size: int = 500
+    
+    # Idempotency-Key support for signup
+    idempotency_ttl_seconds: int = 3600
+    idempotency_max_entries: int = 10000
+    idempotency_wait_timeout_seconds: int = 10
+    
+    # User change feed (GET /api/v1/users/changes)
+    change_feed_poll_interval_seconds: float = 1.0
+    change_feed_max_wait_seconds: int = 30
+    change_feed_max_batch_size: int = 1000
+    # Changes older than this are pruned; 0 keeps them forever
+    change_feed_retention_hours: int = 168
+    change_feed_prune_interval_seconds: int = 3600
+    
+    # Profiling (POST /debug/profile)
+    profiler_sample_interval_ms: int = 10
+    profiler_max_seconds: int = 60
     
     @property
     def database_url(self) -> str:
         return f"postgresql+asyncpg://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
     
+    @property
+    def sharding_enabled(self) -> bool:
+        return bool(self.shard_dsns) or self.local_shard_count > 0
+    
+    @property
+    def local_shard_names(self) -> List[str]:
+        return [f"{self.db_name}_shard{i}" for i in range(self.local_shard_count)]
+    
+    @property
+    def shard_urls(self) -> List[str]:
+        """Database URL per shard, in shard order - just database_url when not sharded"""
+        if self.shard_dsns:
+            return list(self.shard_dsns)
+        if self.local_shard_count > 0:
+            base_url = self.database_url.rsplit("/", 1)[0]
+            return [f"{base_url}/{name}" for name in self.local_shard_names]
+        return [self.database_url]
+    
     class Config:
         env_file = ".env"
         env_prefix = "USERS_"
@@ -2,26 +2,61 @@
 Database connection and session management
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.horizontal_shard import ShardedSession
 from sqlalchemy.orm import sessionmaker
 
 from .config import settings
+from .query_metrics import instrument_engine
+from .sharding import ShardRouter
 
-# Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,  # Set to True for SQL query logging
-    pool_size=10,
-    max_overflow=20,
-)
+
+def create_engine_for(url: str) -> AsyncEngine:
+    """Create an async engine with its own pool and query instrumentation"""
+    shard_engine = create_async_engine(
+        url,
+        echo=False,  # Set to True for SQL query logging
+        pool_size=10,
+        max_overflow=20,
+    )
+
+    # Per-statement latency metrics and slow-query logging
+    instrument_engine(shard_engine.sync_engine)
+    return shard_engine
+
+
+# Shard router - a single shard "0" unless sharding is configured
+shard_router = ShardRouter(len(settings.shard_urls), enabled=settings.sharding_enabled)
+
+# Create async engines, one per shard
+engines = {
+    shard_id: create_engine_for(url)
+    for shard_id, url in zip(shard_router.shard_ids, settings.shard_urls)
+}
+
+# Primary engine (the only one when not sharded)
+engine = engines["0"]
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+if shard_router.enabled:
+    AsyncSessionLocal = sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=ShardedSession,
+        # ShardedSession is a sync Session underneath - it needs the sync engines
+        shards={shard_id: shard_engine.sync_engine for shard_id, shard_engine in engines.items()},
+        shard_chooser=shard_router.shard_chooser,
+        identity_chooser=shard_router.identity_chooser,
+        execute_chooser=shard_router.execute_chooser,
+        twophase=settings.shard_two_phase_commit,
+        expire_on_commit=False,
+    )
+else:
+    AsyncSessionLocal = sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
 
 # Base class for SQLAlchemy models
 Base = declarative_base()
@@ -33,4 +68,4 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
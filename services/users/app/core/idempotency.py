@@ -0,0 +1,143 @@
+"""
+Idempotency-Key support - replay the first completed response for retried requests
+
+The first request with a given key runs normally and its response is stored;
+retries with the same key get the stored response back without re-running the
+handler. Concurrent duplicates wait for the in-flight original instead of
+racing it. Storage is pluggable: the default in-process store is bounded and
+TTL-evicted, so it only deduplicates retries that land on the same worker.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+
+@dataclass
+class StoredResponse:
+    """A completed response recorded under an idempotency key"""
+    fingerprint: str
+    status_code: int
+    body: Any
+
+
+class IdempotencyKeyMismatch(Exception):
+    """Raised when a key is reused with a different request payload"""
+
+
+class IdempotencyRequestInProgress(Exception):
+    """Raised when the original request is still running after the wait timeout"""
+
+
+class IdempotencyStore(ABC):
+    """Storage backend for completed responses"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, response: StoredResponse) -> None:
+        ...
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-worker LRU store with TTL expiry"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    async def set(self, key: str, response: StoredResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class IdempotencyManager:
+    """Coordinates stored responses and in-flight originals for idempotency keys"""
+
+    def __init__(self, store: IdempotencyStore, wait_timeout: float):
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    @staticmethod
+    def fingerprint(*parts: str) -> str:
+        """
+        Hash the request payload so a reused key with a different body is detected.
+        Keyed with the service secret - the payload includes the password, and a
+        plain hash in a (possibly shared) store could be brute-forced offline.
+        """
+        return hmac.new(
+            settings.jwt_secret_key.encode(), "\0".join(parts).encode(), hashlib.sha256
+        ).hexdigest()
+
+    async def acquire(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Return the stored response for a replay, or None if the caller now owns
+        the key and must run the request, then call complete() and release()
+        """
+        while True:
+            stored = await self.store.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    raise IdempotencyKeyMismatch(key)
+                return stored
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                self._in_flight[key] = (fingerprint, asyncio.get_running_loop().create_future())
+                return None
+
+            in_flight_fingerprint, done = in_flight
+            if in_flight_fingerprint != fingerprint:
+                raise IdempotencyKeyMismatch(key)
+
+            try:
+                await asyncio.wait_for(asyncio.shield(done), timeout=self.wait_timeout)
+            except asyncio.TimeoutError:
+                raise IdempotencyRequestInProgress(key)
+            # Original finished - loop to pick up its stored response, or take
+            # ownership if it failed without storing one
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: Any) -> None:
+        """Store the response of a successfully completed original"""
+        await self.store.set(key, StoredResponse(fingerprint=fingerprint, status_code=status_code, body=body))
+
+    def release(self, key: str) -> None:
+        """Drop in-flight ownership of a key and wake any waiting duplicates"""
+        in_flight = self._in_flight.pop(key, None)
+        if in_flight is not None and not in_flight[1].done():
+            in_flight[1].set_result(None)
+
+
+# Global idempotency manager for this worker - swap the store for a shared
+# backend to deduplicate retries across workers
+idempotency = IdempotencyManager(
+    store=InMemoryIdempotencyStore(
+        max_entries=settings.idempotency_max_entries,
+        ttl=settings.idempotency_ttl_seconds,
+    ),
+    wait_timeout=settings.idempotency_wait_timeout_seconds,
+)
@@ -2,11 +2,12 @@
 Database initialization - creates tables if they don't exist
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy import text
+from sqlalchemy.pool import NullPool
 import structlog
 
-from .database import engine, Base
+from .database import engines, Base
 from .config import settings
 
 logger = structlog.get_logger()
@@ -15,20 +16,40 @@ logger = structlog.get_logger()
 async def create_tables():
     """Create database tables if they don't exist"""
     try:
-        async with engine.begin() as conn:
-            # Create all tables defined in models
-            await conn.run_sync(Base.metadata.create_all)
+        for shard_id, shard_engine in engines.items():
+            async with shard_engine.begin() as conn:
+                # Create all tables defined in models
+                await conn.run_sync(Base.metadata.create_all)
         
-        logger.info("Database tables created successfully")
+        logger.info("Database tables created successfully", shards=len(engines))
         
     except Exception as e:
         logger.error("Failed to create database tables", error=str(e))
         raise
 
 
+async def create_local_shard_databases():
+    """Test mode: create the <db_name>_shard<i> databases on the local server"""
+    # CREATE DATABASE can't run inside a transaction
+    admin_engine = create_async_engine(settings.database_url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    try:
+        async with admin_engine.connect() as conn:
+            for name in settings.local_shard_names:
+                exists = await conn.scalar(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": name}
+                )
+                if not exists:
+                    await conn.execute(text(f'CREATE DATABASE "{name}"'))
+                    logger.info("Created local shard database", database=name)
+    finally:
+        await admin_engine.dispose()
+
+
 async def init_database():
     """Initialize database with tables and any seed data"""
     try:
+        if settings.local_shard_count > 0:
+            await create_local_shard_databases()
         await create_tables()
         logger.info("Database initialization completed")
         
@@ -0,0 +1,87 @@
+"""
+On-demand statistical sampling profiler
+
+Samples the Python stacks of every thread in the worker (including the thread
+running the asyncio event loop) at a fixed interval and aggregates them into
+collapsed-stack format, ready for flamegraph.pl / speedscope / inferno.
+
+Nothing runs unless a profile is requested: the sampler thread only exists for
+the duration of a profile, and only one profile may run at a time.
+"""
+
+import sys
+import threading
+import time
+from types import FrameType
+from collections import Counter
+from typing import Optional
+
+from .config import settings
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+
+class SamplingProfiler:
+    """Collects collapsed stacks by periodically walking sys._current_frames()"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float) -> str:
+        """
+        Sample all threads for `seconds` and return collapsed-stack output
+
+        Blocks the calling thread, so call it via asyncio.to_thread() from
+        async code. Raises ProfilerBusyError if a profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        try:
+            stacks = self._sample(seconds)
+        finally:
+            self._lock.release()
+
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+
+    def _sample(self, seconds: float) -> Counter:
+        stacks: Counter = Counter()
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            thread_names = {t.ident: t.name for t in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                # Skip the sampler itself
+                if ident == own_ident:
+                    continue
+                thread_name = thread_names.get(ident, f"thread-{ident}")
+                stacks[self._collapse(thread_name, frame)] += 1
+
+            time.sleep(self.interval)
+
+        return stacks
+
+    @staticmethod
+    def _collapse(thread_name: str, frame: Optional[FrameType]) -> str:
+        """Render a frame chain root-first as `thread;func (file:line);...`"""
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+
+        frames.append(thread_name.replace(";", "_").replace(" ", "_"))
+        return ";".join(reversed(frames))
+
+
+# Global profiler instance shared by the worker
+profiler = SamplingProfiler(interval=settings.profiler_sample_interval_ms / 1000)
@@ -0,0 +1,105 @@
+"""
+SQL statement instrumentation - per-fingerprint latency, call and row metrics
+plus a structured slow-query log
+"""
+
+import re
+import time
+from functools import lru_cache
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..api.metrics import db_query_count, db_query_duration, db_query_rows, db_slow_query_count
+from .config import settings
+
+logger = structlog.get_logger()
+
+# Fingerprints beyond this many distinct statements are reported as "other"
+# so ad-hoc SQL can't blow up metric cardinality
+MAX_FINGERPRINTS = 500
+OVERFLOW_FINGERPRINT = "other"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+")
+# A placeholder inside an IN/VALUES list, including the casts asyncpg adds
+# (`$1::BIGINT` -> `?::BIGINT`) and explicit `CAST(? AS ...)`
+_LIST_ITEM = r"(?:\?(?:::[\w ]+(?:\[\])?)?|CAST\s*\(\s*\?\s+AS\s+[\w ]+(?:\[\])?\s*\))"
+_ROW = rf"\(\s*{_LIST_ITEM}(?:\s*,\s*{_LIST_ITEM})*\s*\)"
+_IN_LIST = re.compile(rf"\bIN\s*{_ROW}", re.IGNORECASE)
+_VALUES_LIST = re.compile(rf"\bVALUES\s*{_ROW}(?:\s*,\s*{_ROW})*", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_seen_fingerprints: set = set()
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a SQL statement so queries differing only in literals or
+    bind parameters share a fingerprint, e.g.
+    `SELECT users.id FROM users WHERE users.email = $1` ->
+    `SELECT users.id FROM users WHERE users.email = ?`
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    normalized = _VALUES_LIST.sub("VALUES (?)", normalized)
+    return normalized
+
+
+def _metric_label(statement_fingerprint: str) -> str:
+    """Bound the number of distinct fingerprint label values"""
+    if statement_fingerprint in _seen_fingerprints:
+        return statement_fingerprint
+    if len(_seen_fingerprints) >= MAX_FINGERPRINTS:
+        return OVERFLOW_FINGERPRINT
+    _seen_fingerprints.add(statement_fingerprint)
+    return statement_fingerprint
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Keep the start time on the execution context so failed statements
+    # don't leave anything behind on the connection
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "_query_start_time", None)
+    if start_time is None:
+        return
+    duration = time.perf_counter() - start_time
+
+    statement_fingerprint = fingerprint(statement)
+    label = _metric_label(statement_fingerprint)
+
+    db_query_count.labels(fingerprint=label).inc()
+    db_query_duration.labels(fingerprint=label).observe(duration)
+
+    # rowcount is -1 when the driver can't report it - notably for streamed
+    # (server-side cursor) results, whose rows are fetched after this hook and
+    # whose duration therefore only covers opening the cursor
+    rows = getattr(cursor, "rowcount", -1)
+    if rows is not None and rows >= 0:
+        db_query_rows.labels(fingerprint=label).inc(rows)
+
+    if duration * 1000 >= settings.slow_query_threshold_ms:
+        db_slow_query_count.labels(fingerprint=label).inc()
+        # Parameters are deliberately not logged - they may contain emails or hashes
+        logger.warning(
+            "Slow query",
+            fingerprint=statement_fingerprint,
+            duration_ms=round(duration * 1000, 2),
+            rows=rows,
+            executemany=executemany
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach query instrumentation to a (sync) engine, e.g. `async_engine.sync_engine`"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
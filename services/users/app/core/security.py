@@ -2,6 +2,7 @@
 Security utilities for authentication and password handling
 """
 
+import asyncio
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -14,14 +15,16 @@ from .config import settings
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def hash_password(password: str) -> str:
+# bcrypt is deliberately slow CPU work - it runs in a worker thread so it never
+# blocks the event loop; the auth admission class bounds how many run at once
+async def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    return await asyncio.to_thread(pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,96 @@
+"""
+Hash-sharded users storage - routing rules shared by the app and Alembic
+
+Users live on the shard chosen by a stable hash of their lowercased signup
+email, and that shard's index is encoded in the low SHARD_BITS of the user id,
+so both email- and id-keyed lookups go straight to one shard:
+
+    user_id = (nextval('users_id_seq') << SHARD_BITS) | shard_index
+
+If a user later changes to an email that hashes elsewhere, the row stays on its
+home shard and the user_email_index row on the new email's shard points back to
+it. user_email_index is also what enforces email uniqueness across shards.
+
+When sharding is disabled there is a single shard "0", routing is a no-op and
+ids are plain serials.
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+# Low id bits reserved for the shard index - caps the cluster at 64 shards
+SHARD_BITS = 6
+MAX_SHARDS = 1 << SHARD_BITS
+
+
+class ShardRouter:
+    """Maps emails and user ids to shard ids ("0", "1", ...)"""
+
+    def __init__(self, shard_count: int, enabled: bool):
+        if not 1 <= shard_count <= MAX_SHARDS:
+            raise ValueError(f"Shard count must be between 1 and {MAX_SHARDS}, got {shard_count}")
+        self.shard_count = shard_count
+        self.enabled = enabled
+        self.shard_ids: List[str] = [str(i) for i in range(shard_count)]
+
+    def shard_for_email(self, email: str) -> str:
+        if not self.enabled:
+            return "0"
+        # Stable across processes and restarts, unlike hash()
+        digest = hashlib.blake2b(email.lower().encode(), digest_size=8).digest()
+        return str(int.from_bytes(digest, "big") % self.shard_count)
+
+    def shard_for_user_id(self, user_id: int) -> Optional[str]:
+        """None when the id can't belong to any configured shard (e.g. a caller-supplied id)"""
+        if not self.enabled:
+            return "0"
+        shard_index = user_id & (MAX_SHARDS - 1)
+        if user_id <= 0 or shard_index >= self.shard_count:
+            return None
+        return str(shard_index)
+
+    def make_user_id(self, sequence_value: int, shard_id: str) -> int:
+        """Build a user id that routes back to shard_id"""
+        return (sequence_value << SHARD_BITS) | int(shard_id)
+
+    # bind_arguments for Session.execute(); empty when not sharded so plain
+    # sessions behave exactly as before
+
+    def bind_for_shard(self, shard_id: str) -> Dict[str, str]:
+        return {"shard_id": shard_id} if self.enabled else {}
+
+    def bind_for_email(self, email: str) -> Dict[str, str]:
+        return self.bind_for_shard(self.shard_for_email(email))
+
+    def bind_for_user_id(self, user_id: int) -> Dict[str, str]:
+        return self.bind_for_shard(self.shard_for_user_id(user_id))
+
+    # Hooks for sqlalchemy.ext.horizontal_shard.ShardedSession. Statements in
+    # this service pass an explicit shard_id; these only cover ORM flushes,
+    # identity lookups and unrouted queries (which fan out to every shard).
+
+    def shard_chooser(self, mapper, instance, clause=None, **kw) -> str:
+        table = mapper.local_table.name if mapper is not None else None
+        if instance is not None:
+            shard_id = None
+            if table == "users":
+                shard_id = self.shard_for_user_id(instance.id)
+            elif table == "user_changes":
+                shard_id = self.shard_for_user_id(instance.user_id)
+            elif table == "user_email_index":
+                shard_id = self.shard_for_email(instance.email)
+            if shard_id is not None:
+                return shard_id
+        raise ValueError(f"Cannot route statement for table {table!r} without an explicit shard_id")
+
+    def identity_chooser(self, mapper, primary_key, **kw) -> List[str]:
+        table = mapper.local_table.name
+        if table == "users":
+            shard_id = self.shard_for_user_id(primary_key[0])
+            return [shard_id] if shard_id is not None else []
+        if table == "user_email_index":
+            return [self.shard_for_email(primary_key[0])]
+        return self.shard_ids
+
+    def execute_chooser(self, orm_context) -> List[str]:
+        return self.shard_ids
@@ -5,13 +5,18 @@ Main application entry point
 
 import structlog
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import time
 
-from .api import auth, users, health, metrics
+from .api import auth, users, health, metrics, debug
 from .api.metrics import request_count, request_duration
+from .core.admission import AdmissionRejected, admission_controller
 from .core.config import settings
 from .core.init_db import init_database
+from .services.change_feed import change_feed
+from .services.email_filter import email_filter
+from .services.login_activity import login_activity
 
 # Configure structured logging
 structlog.configure(
@@ -50,6 +55,55 @@ async def startup_event():
     logger.info("Initializing database...")
     await init_database()
     logger.info("Database initialization completed")
+    
+    if settings.email_filter_enabled:
+        email_filter.start()
+    
+    login_activity.start()
+    change_feed.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks on application shutdown"""
+    await email_filter.stop()
+    await login_activity.stop()
+    await change_feed.stop()
+
+
+@app.middleware("http")
+async def admission_control_middleware(request: Request, call_next):
+    """Shed load per route class before requests reach the database or hasher"""
+    limiter = admission_controller.limiter_for(request.url.path) if settings.admission_enabled else None
+    if limiter is None:
+        return await call_next(request)
+    
+    try:
+        await limiter.acquire()
+    except AdmissionRejected as e:
+        logger.warning(
+            "Request shed by admission control",
+            path=request.url.path,
+            route_class=e.route_class,
+            reason=e.reason
+        )
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service overloaded. Please retry shortly."},
+            headers={"Retry-After": str(settings.admission_retry_after_seconds)}
+        )
+    
+    start_time = time.perf_counter()
+    latency = None
+    overloaded = True
+    try:
+        response = await call_next(request)
+        latency = time.perf_counter() - start_time
+        overloaded = response.status_code >= 500
+        return response
+    finally:
+        limiter.release(latency, overloaded=overloaded)
+
 
 # CORS middleware for frontend integration
 app.add_middleware(
@@ -107,6 +161,7 @@ async def logging_and_metrics_middleware(request: Request, call_next):
 # Include routers
 app.include_router(health.router)
 app.include_router(metrics.router)
+app.include_router(debug.router)
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 
@@ -3,7 +3,7 @@ User SQLAlchemy model
 """
 
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String
 from sqlalchemy.sql import func
 
 from ..core.database import Base
@@ -13,13 +13,17 @@ class User(Base):
     """User model - migrated from monolith user table"""
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # BigInteger so sharded ids (sequence << SHARD_BITS | shard) have room to grow
+    id = Column(BigInteger, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Login activity - flushed in batches by LoginActivityBuffer, does not bump updated_at
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
+    login_count = Column(Integer, default=0, server_default="0", nullable=False)
 
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}', name='{self.name}')>"
\ No newline at end of file
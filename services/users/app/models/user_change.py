@@ -0,0 +1,33 @@
+"""
+User change feed SQLAlchemy model
+"""
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, SmallInteger, String
+from sqlalchemy.sql import func
+
+from ..core.database import Base
+
+
+class UserChange(Base):
+    """One row per user create/update, written in the same transaction as the change"""
+    __tablename__ = "user_changes"
+
+    seq = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(BigInteger, nullable=False, index=True)
+    change_type = Column(String(20), nullable=False)
+    email = Column(String(100), nullable=False)
+    is_admin = Column(Boolean, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<UserChange(seq={self.seq}, user_id={self.user_id}, change_type='{self.change_type}')>"
+
+
+
+class UserChangeFeedState(Base):
+    """Single-row bookkeeping for the change feed - how far it has been pruned"""
+    __tablename__ = "user_change_feed_state"
+
+    id = Column(SmallInteger, primary_key=True, autoincrement=False, default=1)
+    # Every user_changes row with seq <= pruned_through has been deleted
+    pruned_through = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,21 @@
+"""
+Email -> user id index SQLAlchemy model (sharded mode)
+"""
+
+from sqlalchemy import BigInteger, Column, String
+
+from ..core.database import Base
+
+
+class UserEmailIndex(Base):
+    """
+    Lives on the shard chosen by the email's hash and points at the user's home
+    shard (via the user id). Enforces email uniqueness across shards.
+    """
+    __tablename__ = "user_email_index"
+
+    email = Column(String(100), primary_key=True)
+    user_id = Column(BigInteger, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserEmailIndex(email='{self.email}', user_id={self.user_id})>"
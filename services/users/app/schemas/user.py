@@ -3,7 +3,7 @@ Pydantic schemas for user data validation and serialization
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 
 
@@ -45,4 +45,23 @@ class Token(BaseModel):
     """JWT token response"""
     access_token: str
     token_type: str = "bearer"
-    user: UserResponse
\ No newline at end of file
+    user: UserResponse
+
+
+class UserChangeResponse(BaseModel):
+    """One entry in the user change feed"""
+    seq: int
+    user_id: int
+    change_type: str
+    email: EmailStr
+    is_admin: bool
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class UserChangeFeed(BaseModel):
+    """A batch of user changes plus the cursor to pass as `since` next time"""
+    changes: List[UserChangeResponse]
+    cursor: str
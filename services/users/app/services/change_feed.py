@@ -0,0 +1,221 @@
+"""
+User change feed - incremental, cursor-based stream of user creates/updates
+
+Every create_user/update_user writes a user_changes row in the same
+transaction. Writers take a transaction-level advisory lock before inserting,
+so change rows commit in seq order and a consumer reading `seq > cursor` can
+never skip a row that commits later with a lower seq.
+
+With sharding enabled each shard has its own user_changes sequence, so the
+cursor holds one position per shard ("12.40.7"); unsharded it is a single
+number. Consumers treat it as opaque.
+
+Rows older than the retention window are pruned in the background. Each shard
+records how far it has been pruned, and a cursor pointing before that point
+raises ChangeFeedCursorExpired so the consumer knows it missed changes and
+must re-sync. A cursor position of 0 means "from the oldest retained change";
+returned cursors only hold 0 for shards that have never had a change.
+
+Consumers long-poll: if nothing is newer than their cursor the request waits
+until a local write wakes it or the next poll finds changes written by another
+worker, up to the requested timeout.
+"""
+
+import asyncio
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import List, Optional, Tuple
+
+import structlog
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, shard_router
+from ..models.user import User
+from ..models.user_change import UserChange, UserChangeFeedState
+
+logger = structlog.get_logger()
+
+# Arbitrary constant identifying the change feed's advisory lock ("user")
+CHANGE_FEED_LOCK_ID = 0x75736572
+
+
+class ChangeFeedCursorExpired(Exception):
+    """Raised when a cursor points at changes that have already been pruned"""
+
+
+class ChangeFeed:
+    """Records user changes and serves them to long-polling consumers"""
+
+    def __init__(self, poll_interval: float, retention: Optional[timedelta], prune_interval: float):
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self._changed = asyncio.Event()
+        self._prune_task: Optional[asyncio.Task] = None
+
+    async def record(self, db: AsyncSession, user: User, change_type: str) -> None:
+        """Add a change row to the caller's transaction - call right before commit"""
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"),
+            {"lock_id": CHANGE_FEED_LOCK_ID},
+            bind_arguments=shard_router.bind_for_user_id(user.id)
+        )
+        db.add(UserChange(
+            user_id=user.id,
+            change_type=change_type,
+            email=user.email,
+            is_admin=user.is_admin
+        ))
+
+    def notify(self) -> None:
+        """Wake local long-pollers after a change has been committed"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    @staticmethod
+    def parse_cursor(cursor: str) -> List[int]:
+        """Decode a cursor into one position per shard; raises ValueError if malformed"""
+        positions = [int(part) for part in cursor.split(".")]
+        if len(positions) > shard_router.shard_count or any(position < 0 for position in positions):
+            raise ValueError(f"Invalid change feed cursor: {cursor!r}")
+        # Shorter cursors (e.g. the initial "0") start the remaining shards from the beginning
+        return positions + [0] * (shard_router.shard_count - len(positions))
+
+    @staticmethod
+    def format_cursor(positions: List[int]) -> str:
+        return ".".join(str(position) for position in positions)
+
+    async def get_changes(self, since: List[int], limit: int) -> Tuple[List[UserChange], List[int]]:
+        """Return up to `limit` changes after the per-shard positions, and the new positions"""
+        per_shard = []
+        positions = list(since)
+        async with AsyncSessionLocal() as session:
+            for index, (shard_id, position) in enumerate(zip(shard_router.shard_ids, since)):
+                bind_arguments = shard_router.bind_for_shard(shard_id)
+                high_water, pruned_through = (await session.execute(
+                    select(
+                        select(func.max(UserChange.seq)).scalar_subquery(),
+                        select(UserChangeFeedState.pruned_through).scalar_subquery(),
+                    ),
+                    bind_arguments=bind_arguments
+                )).one()
+                pruned_through = pruned_through or 0
+                if 0 < position < pruned_through:
+                    raise ChangeFeedCursorExpired(f"Shard {shard_id} pruned through {pruned_through}")
+
+                result = await session.execute(
+                    select(UserChange)
+                    .where(UserChange.seq > position)
+                    .order_by(UserChange.seq)
+                    .limit(limit),
+                    bind_arguments=bind_arguments
+                )
+                rows = result.scalars().all()
+                per_shard.append(rows)
+
+                # Advance past seqs known not to exist, so a returned cursor only
+                # holds 0 for a shard that has never had a row - a consumer
+                # coming back after pruning then gets expired instead of
+                # silently skipping what was pruned
+                if rows:
+                    positions[index] = max(position, rows[0].seq - 1)
+                else:
+                    positions[index] = max(position, high_water or 0, pruned_through)
+
+        # Interleave shards roughly by time. merge() only ever takes the head of
+        # each shard's list, so every shard contributes a seq-ordered prefix and
+        # its cursor position never skips a row. Per-user order is preserved
+        # since a user's changes all live on one shard.
+        changes = list(islice(heapq.merge(*per_shard, key=lambda change: change.changed_at), limit))
+
+        for change in changes:
+            shard_index = int(shard_router.shard_for_user_id(change.user_id))
+            positions[shard_index] = max(positions[shard_index], change.seq)
+        return changes, positions
+
+    async def wait_for_changes(
+        self, since: List[int], limit: int, timeout: float
+    ) -> Tuple[List[UserChange], List[int]]:
+        """Return changes after `since`, waiting up to `timeout` seconds for the first one"""
+        deadline = time.monotonic() + timeout
+
+        while True:
+            changed = self._changed
+            changes, positions = await self.get_changes(since, limit)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes, positions
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def prune(self) -> None:
+        """Delete changes older than the retention window on every shard"""
+        cutoff = datetime.now(timezone.utc) - self.retention
+
+        async with AsyncSessionLocal() as session:
+            for shard_id in shard_router.shard_ids:
+                bind_arguments = shard_router.bind_for_shard(shard_id)
+                # Change rows commit in seq order, so everything up to the newest
+                # expired seq is expired and committed
+                prune_through = (await session.execute(
+                    select(func.max(UserChange.seq)).where(UserChange.changed_at < cutoff),
+                    bind_arguments=bind_arguments
+                )).scalar_one_or_none()
+                if prune_through is None:
+                    continue
+
+                result = await session.execute(
+                    delete(UserChange).where(UserChange.seq <= prune_through),
+                    bind_arguments=bind_arguments
+                )
+                statement = insert(UserChangeFeedState).values(id=1, pruned_through=prune_through)
+                await session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[UserChangeFeedState.id],
+                        set_={"pruned_through": func.greatest(
+                            UserChangeFeedState.pruned_through, statement.excluded.pruned_through
+                        )}
+                    ),
+                    bind_arguments=bind_arguments
+                )
+                await session.commit()
+
+                logger.info("Change feed pruned", shard=shard_id, pruned_through=prune_through, rows=result.rowcount)
+
+    async def _prune_periodically(self) -> None:
+        while True:
+            try:
+                await self.prune()
+            except Exception as e:
+                logger.error("Change feed prune failed", error=str(e))
+            await asyncio.sleep(self.prune_interval)
+
+    def start(self) -> None:
+        """Start background pruning, unless changes are retained forever"""
+        if self.retention is not None and self._prune_task is None:
+            self._prune_task = asyncio.create_task(self._prune_periodically())
+
+    async def stop(self) -> None:
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            try:
+                await self._prune_task
+            except asyncio.CancelledError:
+                pass
+            self._prune_task = None
+
+
+# Global change feed for this worker
+change_feed = ChangeFeed(
+    poll_interval=settings.change_feed_poll_interval_seconds,
+    retention=timedelta(hours=settings.change_feed_retention_hours) if settings.change_feed_retention_hours > 0 else None,
+    prune_interval=settings.change_feed_prune_interval_seconds,
+)
@@ -0,0 +1,138 @@
+"""
+Per-worker Bloom filter of registered emails
+
+Lets email_exists answer definite "not registered" without a database round
+trip. Built at startup with a streaming scan of users.email, updated locally on
+create/update, and rebuilt periodically to pick up users created by other
+workers. Until the first build completes every check falls through to the DB.
+"""
+
+import asyncio
+import time
+from typing import Optional, Set
+
+import structlog
+from sqlalchemy import func, select
+
+from ..api.metrics import (
+    email_filter_checks,
+    email_filter_false_positive_rate,
+    email_filter_items,
+    email_filter_rebuild_duration,
+    email_filter_size_bytes,
+)
+from ..core.bloom import BloomFilter
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, shard_router
+from ..models.user import User
+
+logger = structlog.get_logger()
+
+
+class EmailFilter:
+    """Bloom filter of lowercased emails with background rebuilds"""
+
+    def __init__(self, false_positive_rate: float, min_capacity: int, rebuild_interval: float):
+        self.false_positive_rate = false_positive_rate
+        self.min_capacity = min_capacity
+        self.rebuild_interval = rebuild_interval
+        self._filter: Optional[BloomFilter] = None
+        # Emails added while a rebuild scan is running, replayed into the new filter
+        self._pending: Optional[Set[str]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_contain(self, email: str) -> bool:
+        """False means the email is definitely not registered (as of the last rebuild)"""
+        if self._filter is None:
+            return True
+        return email.lower() in self._filter
+
+    def add(self, email: str) -> None:
+        email = email.lower()
+        if self._pending is not None:
+            self._pending.add(email)
+        if self._filter is not None:
+            self._filter.add(email)
+            self._export_metrics()
+
+    def record_check(self, result: str) -> None:
+        email_filter_checks.labels(result=result).inc()
+
+    async def rebuild(self) -> None:
+        """Build a fresh filter from a streaming scan of all emails and swap it in"""
+        start_time = time.perf_counter()
+        self._pending = set()
+        try:
+            async with AsyncSessionLocal() as session:
+                count = 0
+                for shard_id in shard_router.shard_ids:
+                    count += (await session.execute(
+                        select(func.count(User.id)),
+                        bind_arguments=shard_router.bind_for_shard(shard_id)
+                    )).scalar_one()
+                # Leave headroom for signups until the next rebuild
+                new_filter = BloomFilter(max(self.min_capacity, count * 2), self.false_positive_rate)
+
+                for shard_id in shard_router.shard_ids:
+                    stream = await session.stream_scalars(
+                        select(User.email).execution_options(yield_per=settings.email_filter_scan_batch_size),
+                        bind_arguments=shard_router.bind_for_shard(shard_id)
+                    )
+                    async for email in stream:
+                        new_filter.add(email.lower())
+
+            for email in self._pending:
+                new_filter.add(email)
+            self._filter = new_filter
+        finally:
+            self._pending = None
+
+        duration = time.perf_counter() - start_time
+        email_filter_rebuild_duration.observe(duration)
+        self._export_metrics()
+        logger.info(
+            "Email filter rebuilt",
+            items=new_filter.items,
+            size_bytes=new_filter.size_bytes,
+            estimated_false_positive_rate=round(new_filter.estimated_false_positive_rate, 6),
+            duration_ms=round(duration * 1000, 2)
+        )
+
+    async def _rebuild_periodically(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error("Email filter rebuild failed", error=str(e))
+            await asyncio.sleep(self.rebuild_interval)
+
+    def start(self) -> None:
+        """Start building the filter and keep rebuilding it in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._rebuild_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _export_metrics(self) -> None:
+        email_filter_items.set(self._filter.items)
+        email_filter_size_bytes.set(self._filter.size_bytes)
+        email_filter_false_positive_rate.set(self._filter.estimated_false_positive_rate)
+
+
+# Global filter instance for this worker
+email_filter = EmailFilter(
+    false_positive_rate=settings.email_filter_false_positive_rate,
+    min_capacity=settings.email_filter_min_capacity,
+    rebuild_interval=settings.email_filter_rebuild_interval_seconds,
+)
@@ -0,0 +1,160 @@
+"""
+Write-behind login activity tracking
+
+Logins are recorded in memory per worker and coalesced per user (latest
+timestamp, summed count). A background task flushes them on an interval, or
+sooner once enough users are pending, using one
+`UPDATE ... FROM unnest(...)` per batch - so the login path never waits on a
+write or a row lock. Rows are bound as three arrays, so every batch size shares
+one statement text (and one query fingerprint). Pending activity is flushed on shutdown.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import text
+
+from ..api.metrics import (
+    login_activity_buffer_depth,
+    login_activity_flush_duration,
+    login_activity_flush_failures,
+    login_activity_flushed_users,
+)
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal, shard_router
+
+logger = structlog.get_logger()
+
+# Fixed statement text regardless of batch size
+_UPDATE_LOGIN_ACTIVITY = text(
+    "UPDATE users SET "
+    "last_login_at = GREATEST(users.last_login_at, v.last_login_at), "
+    "login_count = users.login_count + v.login_count "
+    "FROM unnest(CAST(:ids AS BIGINT[]), CAST(:timestamps AS TIMESTAMPTZ[]), CAST(:counts AS INTEGER[])) "
+    "AS v(id, last_login_at, login_count) "
+    "WHERE users.id = v.id"
+)
+
+
+@dataclass
+class LoginActivity:
+    """Coalesced logins for one user since the last flush"""
+    last_login_at: datetime
+    count: int = 1
+
+    def merge(self, other: "LoginActivity") -> None:
+        self.last_login_at = max(self.last_login_at, other.last_login_at)
+        self.count += other.count
+
+
+class LoginActivityBuffer:
+    """Per-worker buffer of login activity, flushed in batches"""
+
+    def __init__(self, flush_interval: float, flush_threshold: int, batch_size: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.batch_size = batch_size
+        self._pending: Dict[int, LoginActivity] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._early_flush: Optional[asyncio.Task] = None
+
+    def record(self, user_id: int) -> None:
+        """Record a successful login - never touches the database"""
+        activity = LoginActivity(last_login_at=datetime.now(timezone.utc))
+        if user_id in self._pending:
+            self._pending[user_id].merge(activity)
+        else:
+            self._pending[user_id] = activity
+        login_activity_buffer_depth.set(len(self._pending))
+
+        if len(self._pending) >= self.flush_threshold and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Write all pending activity; failed batches are merged back for the next flush"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            login_activity_buffer_depth.set(0)
+
+            # Sorted ids keep row lock order consistent across workers
+            items = sorted(pending.items())
+            batches = []
+            for shard_id in shard_router.shard_ids:
+                shard_items = [item for item in items if shard_router.shard_for_user_id(item[0]) == shard_id]
+                for start in range(0, len(shard_items), self.batch_size):
+                    batches.append((shard_id, shard_items[start:start + self.batch_size]))
+
+            for index, (shard_id, batch) in enumerate(batches):
+                try:
+                    await self._write_batch(shard_id, batch)
+                except asyncio.CancelledError:
+                    # Shutting down mid-flush - keep the unwritten rows for the final flush
+                    for _, unwritten in batches[index:]:
+                        self._requeue(unwritten)
+                    raise
+                except Exception as e:
+                    login_activity_flush_failures.inc()
+                    logger.error("Login activity flush failed", error=str(e), users=len(batch), shard=shard_id)
+                    self._requeue(batch)
+
+    async def _write_batch(self, shard_id: str, batch: List[Tuple[int, LoginActivity]]) -> None:
+        params = {
+            "ids": [user_id for user_id, _ in batch],
+            "timestamps": [activity.last_login_at for _, activity in batch],
+            "counts": [activity.count for _, activity in batch],
+        }
+
+        start_time = time.perf_counter()
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                _UPDATE_LOGIN_ACTIVITY, params, bind_arguments=shard_router.bind_for_shard(shard_id)
+            )
+            await session.commit()
+
+        login_activity_flush_duration.observe(time.perf_counter() - start_time)
+        login_activity_flushed_users.inc(len(batch))
+
+    def _requeue(self, batch: List[Tuple[int, LoginActivity]]) -> None:
+        for user_id, activity in batch:
+            if user_id in self._pending:
+                self._pending[user_id].merge(activity)
+            else:
+                self._pending[user_id] = activity
+        login_activity_buffer_depth.set(len(self._pending))
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the background flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out anything still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global buffer instance for this worker
+login_activity = LoginActivityBuffer(
+    flush_interval=settings.login_activity_flush_interval_seconds,
+    flush_threshold=settings.login_activity_flush_threshold,
+    batch_size=settings.login_activity_batch_size,
+)
@@ -2,13 +2,18 @@
 User business logic service
 """
 
+from datetime import datetime
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import delete, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.database import shard_router
 from ..core.security import hash_password, verify_password
 from ..models.user import User
+from ..models.user_email_index import UserEmailIndex
 from ..schemas.user import UserCreate, UserUpdate
+from .change_feed import change_feed
+from .email_filter import email_filter
 
 
 class UserService:
@@ -18,7 +23,7 @@ class UserService:
     async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user - migrated from monolith create_user function"""
         # Hash the password
-        password_hash = hash_password(user_data.password)
+        password_hash = await hash_password(user_data.password)
         
         # Create user instance
         db_user = User(
@@ -28,40 +33,107 @@ class UserService:
             is_admin=False  # New users are not admin by default
         )
         
+        if shard_router.enabled:
+            # Home shard comes from the email hash and is encoded in the id
+            shard_id = shard_router.shard_for_email(db_user.email)
+            sequence_value = (await db.execute(
+                text("SELECT nextval('users_id_seq')"),
+                bind_arguments=shard_router.bind_for_shard(shard_id)
+            )).scalar_one()
+            db_user.id = shard_router.make_user_id(sequence_value, shard_id)
+            db.add(UserEmailIndex(email=db_user.email, user_id=db_user.id))
+        
         db.add(db_user)
+        # Flush to get the id for the change feed row, committed together
+        await db.flush()
+        await change_feed.record(db, db_user, "created")
         await db.commit()
         await db.refresh(db_user)
         
+        email_filter.add(db_user.email)
+        change_feed.notify()
+        
         return db_user
 
     @staticmethod
     async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email - migrated from monolith get_user_by_email"""
+        email = email.lower()
+        
+        if not shard_router.enabled:
+            result = await db.execute(
+                select(User).where(User.email == email)
+            )
+            return result.scalar_one_or_none()
+        
+        # Common case: the user still lives on their email's shard
+        bind_arguments = shard_router.bind_for_email(email)
         result = await db.execute(
-            select(User).where(User.email == email.lower())
+            select(User)
+            .join(UserEmailIndex, UserEmailIndex.user_id == User.id)
+            .where(UserEmailIndex.email == email),
+            bind_arguments=bind_arguments
         )
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        if user is not None:
+            return user
+        
+        # Email changed since signup - follow the index to the home shard
+        result = await db.execute(
+            select(UserEmailIndex.user_id).where(UserEmailIndex.email == email),
+            bind_arguments=bind_arguments
+        )
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
+            return None
+        return await UserService.get_user_by_id(db, user_id)
 
     @staticmethod
     async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID - migrated from monolith get_user_by_id"""
+        if shard_router.shard_for_user_id(user_id) is None:
+            return None
         result = await db.execute(
-            select(User).where(User.id == user_id)
+            select(User).where(User.id == user_id),
+            bind_arguments=shard_router.bind_for_user_id(user_id)
         )
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def email_exists(db: AsyncSession, email: str) -> bool:
-        """Check if email already exists - migrated from monolith email_exists"""
+    async def get_user_updated_at(db: AsyncSession, user_id: int) -> Optional[datetime]:
+        """Get only a user's updated_at - cheap version check for conditional GETs"""
+        if shard_router.shard_for_user_id(user_id) is None:
+            return None
         result = await db.execute(
-            select(User.id).where(User.email == email.lower())
+            select(User.updated_at).where(User.id == user_id),
+            bind_arguments=shard_router.bind_for_user_id(user_id)
         )
-        return result.scalar_one_or_none() is not None
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def email_exists(db: AsyncSession, email: str) -> bool:
+        """Check if email already exists - migrated from monolith email_exists"""
+        # Definite "not registered" from the Bloom filter skips the database
+        if not email_filter.might_contain(email):
+            email_filter.record_check("filter_negative")
+            return False
+        
+        if shard_router.enabled:
+            # The email index on the email's shard covers users on every shard
+            statement = select(UserEmailIndex.user_id).where(UserEmailIndex.email == email.lower())
+        else:
+            statement = select(User.id).where(User.email == email.lower())
+        
+        result = await db.execute(statement, bind_arguments=shard_router.bind_for_email(email))
+        exists = result.scalar_one_or_none() is not None
+        if email_filter.ready:
+            email_filter.record_check("exists" if exists else "false_positive")
+        return exists
 
     @staticmethod
-    def verify_password(user: User, password: str) -> bool:
+    async def verify_password(user: User, password: str) -> bool:
         """Verify user password - migrated from monolith verify_password"""
-        return verify_password(password, user.password_hash)
+        return await verify_password(password, user.password_hash)
 
     @staticmethod
     async def update_user(db: AsyncSession, user_id: int, user_data: UserUpdate) -> Optional[User]:
@@ -73,10 +145,23 @@ class UserService:
         # Update fields if provided
         if user_data.name is not None:
             user.name = user_data.name
-        if user_data.email is not None:
-            user.email = user_data.email.lower()
+        if user_data.email is not None and user_data.email.lower() != user.email:
+            new_email = user_data.email.lower()
+            if shard_router.enabled:
+                # Move the index entry; the user row stays on its home shard
+                await db.execute(
+                    delete(UserEmailIndex).where(UserEmailIndex.email == user.email),
+                    bind_arguments=shard_router.bind_for_email(user.email)
+                )
+                db.add(UserEmailIndex(email=new_email, user_id=user.id))
+            user.email = new_email
         
+        await change_feed.record(db, user, "updated")
         await db.commit()
         await db.refresh(user)
         
+        # The old email stays in the filter until the next rebuild (harmless false positive)
+        email_filter.add(user.email)
+        change_feed.notify()
+        
         return user
\ No newline at end of file
@@ -3,7 +3,7 @@ from logging.config import fileConfig
 
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import async_engine_from_config
+from sqlalchemy.ext.asyncio import async_engine_from_config, create_async_engine
 
 from alembic import context
 
@@ -13,6 +13,9 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.models.user import User
+from app.models.user_change import UserChange, UserChangeFeedState
+from app.models.user_email_index import UserEmailIndex
+from app.core.config import settings
 from app.core.database import Base
 
 # this is the Alembic Config object, which provides
@@ -71,16 +74,24 @@ async def run_async_migrations() -> None:
 
     """
 
-    connectable = async_engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    async with connectable.connect() as connection:
-        await connection.run_sync(do_run_migrations)
-
-    await connectable.dispose()
+    if settings.sharding_enabled:
+        # Same shard list the app routes to - migrate every shard in turn
+        connectables = [
+            create_async_engine(url, poolclass=pool.NullPool)
+            for url in settings.shard_urls
+        ]
+    else:
+        connectables = [async_engine_from_config(
+            config.get_section(config.config_ini_section, {}),
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+        )]
+
+    for connectable in connectables:
+        async with connectable.connect() as connection:
+            await connection.run_sync(do_run_migrations)
+
+        await connectable.dispose()
 
 
 def run_migrations_online() -> None:
@@ -0,0 +1,59 @@
+"""Add user_email_index table and widen user ids for sharded mode
+
+User ids are only widened to BIGINT on sharded or still-empty schemas. On an
+existing unsharded database the ALTER would rewrite users and its indexes under
+an ACCESS EXCLUSIVE lock for a feature that can't be enabled there anyway; see
+the Sharding section of the README for doing it by hand.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _user_ids_are_bigint() -> bool:
+    return op.get_bind().execute(sa.text(
+        "SELECT data_type = 'bigint' FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'users' AND column_name = 'id'"
+    )).scalar()
+
+
+def upgrade() -> None:
+    # Sharded ids are (sequence << 6) | shard - int4 would overflow after ~33M users per shard.
+    # Existing unsharded data keeps INTEGER ids rather than paying for a table rewrite.
+    users_empty = op.get_bind().execute(sa.text("SELECT NOT EXISTS (SELECT 1 FROM users)")).scalar()
+    if settings.sharding_enabled or users_empty:
+        op.execute("ALTER SEQUENCE users_id_seq AS BIGINT")
+        op.alter_column('users', 'id', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=False)
+        op.alter_column('user_changes', 'user_id', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=False)
+
+    # Email -> user id pointers, only maintained when sharding is enabled
+    op.create_table('user_email_index',
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+    op.create_index(op.f('ix_user_email_index_user_id'), 'user_email_index', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_email_index_user_id'), table_name='user_email_index')
+    op.drop_table('user_email_index')
+    if _user_ids_are_bigint():
+        op.alter_column('user_changes', 'user_id', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=False)
+        op.alter_column('users', 'id', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=False)
+        op.execute("ALTER SEQUENCE users_id_seq AS INTEGER")
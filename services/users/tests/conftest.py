@@ -0,0 +1,9 @@
+"""
+Shared test setup
+"""
+
+import os
+
+# Must be set before any test module imports the app, which builds its settings
+# and engines on import - the suite runs in the two-shard local test mode
+os.environ.setdefault("USERS_LOCAL_SHARD_COUNT", "2")
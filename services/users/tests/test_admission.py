@@ -0,0 +1,91 @@
+"""
+AdaptiveLimiter - admission, shedding and slot accounting
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import AdaptiveLimiter, AdmissionRejected, RouteClassConfig
+
+
+def _limiter(limit: int = 1, max_queue: int = 1, queue_timeout: float = 1.0) -> AdaptiveLimiter:
+    config = RouteClassConfig(
+        initial_limit=limit, min_limit=1, max_limit=limit, max_queue=max_queue, target_latency=0.5
+    )
+    return AdaptiveLimiter("test", config, queue_timeout)
+
+
+def test_admits_up_to_limit_and_wakes_waiter_on_release():
+    async def scenario():
+        limiter = _limiter(limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.in_flight == 2
+
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not queued.done()
+
+        limiter.release(latency=0.01)
+        await queued
+        assert limiter.in_flight == 2
+        assert not limiter._waiters
+
+    asyncio.run(scenario())
+
+
+def test_sheds_when_queue_is_full():
+    async def scenario():
+        limiter = _limiter(limit=1, max_queue=1)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == "queue_full"
+
+        limiter.release(latency=0.01)
+        await queued
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_sheds_when_queue_wait_times_out():
+    async def scenario():
+        limiter = _limiter(limit=1, queue_timeout=0.01)
+        await limiter.acquire()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == "queue_timeout"
+        assert limiter.in_flight == 1
+        assert not limiter._waiters
+
+        # The timed-out waiter must not be handed the freed slot
+        limiter.release(latency=0.01)
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancel_after_grant_returns_the_slot():
+    async def scenario():
+        limiter = _limiter(limit=1)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Hand the slot to the waiter, then cancel it before it resumes
+        limiter.release(latency=None)
+        assert limiter.in_flight == 1
+        queued.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert limiter.in_flight == 0
+        assert not limiter._waiters
+
+    asyncio.run(scenario())
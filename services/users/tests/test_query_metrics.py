@@ -0,0 +1,33 @@
+"""
+SQL fingerprinting - statements as asyncpg actually receives them
+"""
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.core.query_metrics import fingerprint
+from app.models.user import User
+from app.models.user_email_index import UserEmailIndex
+
+
+def _asyncpg_sql(statement) -> str:
+    # render_postcompile expands IN lists the way execution does
+    return str(statement.compile(dialect=asyncpg.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+def test_in_list_sizes_share_a_fingerprint():
+    fingerprints = {
+        fingerprint(_asyncpg_sql(select(User.id).where(User.id.in_(list(range(1, size + 1))))))
+        for size in (1, 2, 3, 50)
+    }
+    assert fingerprints == {"SELECT users.id FROM users WHERE users.id IN (?)"}
+
+
+def test_multi_row_values_share_a_fingerprint():
+    fingerprints = {
+        fingerprint(_asyncpg_sql(insert(UserEmailIndex).values([
+            {"email": f"user{i}@example.com", "user_id": i} for i in range(rows)
+        ])))
+        for rows in (1, 2, 10)
+    }
+    assert fingerprints == {"INSERT INTO user_email_index (email, user_id) VALUES (?)"}
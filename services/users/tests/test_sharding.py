@@ -0,0 +1,82 @@
+"""
+Sharded mode against real Postgres - runs the USERS_LOCAL_SHARD_COUNT test mode
+with two local shard databases on USERS_DB_HOST. Skipped if Postgres is unreachable.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engines, shard_router
+from app.core.init_db import init_database
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_service import UserService
+
+
+async def _postgres_available() -> bool:
+    import asyncpg
+    try:
+        conn = await asyncpg.connect(
+            host=settings.db_host, port=settings.db_port, user=settings.db_user,
+            password=settings.db_password, database=settings.db_name, timeout=2
+        )
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError):
+        return False
+    await conn.close()
+    return True
+
+
+def _email_on_other_shard(shard_id: str) -> str:
+    while True:
+        email = f"moved-{uuid.uuid4().hex[:12]}@example.com"
+        if shard_router.shard_for_email(email) != shard_id:
+            return email
+
+
+async def _sharded_user_lifecycle():
+    await init_database()
+    email = f"Shard-{uuid.uuid4().hex[:12]}@Example.com"
+
+    async with AsyncSessionLocal() as db:
+        user = await UserService.create_user(db, UserCreate(name="Shard", email=email, password="secret123"))
+        user_id = user.id
+
+    # Signup places the user on its email's shard and encodes it in the id
+    home_shard = shard_router.shard_for_user_id(user_id)
+    assert home_shard == shard_router.shard_for_email(email)
+
+    async with AsyncSessionLocal() as db:
+        assert (await UserService.get_user_by_email(db, email)).id == user_id
+        assert (await UserService.get_user_by_id(db, user_id)).email == email.lower()
+
+        new_email = _email_on_other_shard(home_shard)
+        updated = await UserService.update_user(db, user_id, UserUpdate(email=new_email))
+        assert updated.email == new_email
+
+    async with AsyncSessionLocal() as db:
+        # The row stays home; the new email's shard points back at it
+        moved = await UserService.get_user_by_email(db, new_email)
+        assert moved is not None and moved.id == user_id
+        assert shard_router.shard_for_user_id(moved.id) == home_shard
+        assert await UserService.email_exists(db, new_email)
+        assert await UserService.get_user_by_email(db, email) is None
+        assert not await UserService.email_exists(db, email)
+
+        # Ids whose shard bits name no configured shard are simply not found
+        for unknown_id in (3, 66, 999999, 0, -1):
+            assert shard_router.shard_for_user_id(unknown_id) is None
+            assert await UserService.get_user_by_id(db, unknown_id) is None
+            assert await UserService.get_user_updated_at(db, unknown_id) is None
+
+    for shard_engine in engines.values():
+        await shard_engine.dispose()
+
+
+def test_sharded_user_lifecycle():
+    if not asyncio.run(_postgres_available()):
+        pytest.skip("Postgres not reachable at USERS_DB_HOST")
+
+    assert shard_router.enabled and shard_router.shard_count == 2
+    asyncio.run(_sharded_user_lifecycle())